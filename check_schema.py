@@ -1,57 +1,111 @@
 #!/usr/bin/env python
-from databricks.sdk import WorkspaceClient
+import argparse
+import hashlib
+import json
 import os
-import time
+import tempfile
 
-w = WorkspaceClient(
-    host=os.getenv('DATABRICKS_HOST'),
-    token=os.getenv('DATABRICKS_TOKEN')
-)
+from dbx_queries import CATALOG, SCHEMA, execute, iter_rows
 
-WAREHOUSE_ID = os.getenv('DATABRICKS_WAREHOUSE_ID')
-CATALOG = os.getenv('DATABRICKS_CATALOG', 'dbx_1')
-SCHEMA = os.getenv('DATABRICKS_SCHEMA', 'default')
+TABLE = f"{CATALOG}.{SCHEMA}.error_logs_parsed"
 
 # First get column names
 sql_columns = f"""
-DESCRIBE {CATALOG}.{SCHEMA}.error_logs_parsed
+DESCRIBE {TABLE}
 """
 
-print("Checking table schema...\n")
+# Latest Delta version, read from the transaction log without a warehouse scan
+sql_version = f"DESCRIBE HISTORY {TABLE} LIMIT 1"
 
-try:
-    response = w.statement_execution.execute_statement(
-        warehouse_id=WAREHOUSE_ID,
-        statement=sql_columns,
-        catalog=CATALOG,
-        schema=SCHEMA
-    )
-    
-    # Wait for query to complete
-    max_wait = 30
-    waited = 0
-    while (response.status and
-           response.status.state in ("RUNNING", "QUEUED") and
-           waited < max_wait):
-        time.sleep(0.5)
-        waited += 0.5
-        if response.statement_id:
-            response = w.statement_execution.get_statement(
-                response.statement_id
-            )
-    
-    # Get results
-    if response.result and response.result.data_array:
-        print("✓ Table schema:\n")
-        print("Column Name           | Data Type")
-        print("-" * 50)
-        for row in response.result.data_array:
-            col_name = row[0]
-            col_type = row[1]
-            print(f"{col_name:20} | {col_type}")
+CACHE_DIR = os.path.join(
+    os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'dbx_mcp'
+)
+
+
+def print_schema(columns):
+    """Print (column name, data type) pairs."""
+    print("✓ Table schema:\n")
+    print("Column Name           | Data Type")
+    print("-" * 50)
+    for col_name, col_type in columns:
+        print(f"{col_name:20} | {col_type}")
+
+
+def show(response):
+    """Print the column listing returned by the DESCRIBE statement."""
+    rows = list(iter_rows(response))
+    if rows:
+        print_schema((row[0], row[1]) for row in rows)
     else:
         print(f"Query status: {response.status.state if response.status else 'unknown'}")
         if response.status and hasattr(response.status, 'error'):
             print(f"Error: {response.status.error}")
-except Exception as e:
-    print(f"✗ Error: {type(e).__name__}: {e}")
+
+
+def table_version():
+    """Return the current Delta version of the table, or None if unknown."""
+    response = execute(sql_version)
+    rows = list(iter_rows(response))
+    if not rows or not response.manifest or not response.manifest.schema:
+        return None
+    columns = [c.name for c in response.manifest.schema.columns]
+    return dict(zip(columns, rows[0])).get('version')
+
+
+def cache_path(version):
+    """Cache file for the schema at a given table version and workspace."""
+    # Different workspaces can hold a same-named table at the same version
+    workspace = hashlib.blake2b(
+        (os.getenv('DATABRICKS_HOST') or '').encode(), digest_size=4
+    ).hexdigest()
+    return os.path.join(
+        CACHE_DIR, f"schema_{workspace}_{TABLE}@{version}.json"
+    )
+
+
+def write_cache(path, columns):
+    """Write the schema atomically so readers never see a partial file."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(columns, f)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Print the error_logs_parsed table schema."
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore the local cache and query the warehouse",
+    )
+    args = parser.parse_args()
+
+    print("Checking table schema...\n")
+
+    try:
+        # The schema only changes with a new table version, so key on it
+        version = table_version()
+        path = cache_path(version) if version is not None else None
+
+        if path and not args.refresh and os.path.exists(path):
+            with open(path) as f:
+                print_schema(json.load(f))
+            return
+
+        response = execute(sql_columns)
+        columns = [[row[0], row[1]] for row in iter_rows(response)]
+        if not columns:
+            show(response)
+            return
+        if path:
+            write_cache(path, columns)
+        print_schema(columns)
+    except Exception as e:
+        print(f"✗ Error: {type(e).__name__}: {e}")
+
+
+if __name__ == "__main__":
+    main()
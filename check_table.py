@@ -1,47 +1,34 @@
 #!/usr/bin/env python
-from databricks.sdk import WorkspaceClient
-import os
-import time
+from dbx_queries import CATALOG, SCHEMA, execute, iter_rows
 
-w = WorkspaceClient(
-    host=os.getenv('DATABRICKS_HOST'),
-    token=os.getenv('DATABRICKS_TOKEN')
-)
+# DESCRIBE DETAIL is answered from the Delta transaction log, so checking
+# existence and size never scans the table's data files
+sql_check = f"DESCRIBE DETAIL {CATALOG}.{SCHEMA}.error_logs_parsed"
 
-WAREHOUSE_ID = os.getenv('DATABRICKS_WAREHOUSE_ID')
-CATALOG = os.getenv('DATABRICKS_CATALOG', 'dbx_1')
-SCHEMA = os.getenv('DATABRICKS_SCHEMA', 'default')
 
-print("Checking if table exists...\n")
-
-# First check if table exists
-sql_check = f"SELECT COUNT(*) as count FROM {CATALOG}.{SCHEMA}.error_logs_parsed LIMIT 1"
-
-try:
-    response = w.statement_execution.execute_statement(
-        warehouse_id=WAREHOUSE_ID,
-        statement=sql_check,
-        catalog=CATALOG,
-        schema=SCHEMA
-    )
-    
-    # Wait for query
-    while (response.status and
-           response.status.state in ("RUNNING", "QUEUED")):
-        time.sleep(0.5)
-        if response.statement_id:
-            response = w.statement_execution.get_statement(
-                response.statement_id
-            )
-    
-    if response.result and response.result.data_array:
-        count = response.result.data_array[0][0]
-        print(f"✓ Table exists with {count} rows")
+def show(response):
+    """Print whether the table exists and how large it is."""
+    rows = list(iter_rows(response))
+    if rows and response.manifest and response.manifest.schema:
+        columns = [c.name for c in response.manifest.schema.columns]
+        detail = dict(zip(columns, rows[0]))
+        print(f"✓ Table exists with {detail.get('numFiles')} files "
+              f"({detail.get('sizeInBytes')} bytes)")
     else:
         print("✗ Table query returned empty")
-        
-except Exception as e:
-    print(f"✗ Table check failed: {type(e).__name__}")
-    print(f"  Details: {e}")
-    print("\n⚠ The error_logs_parsed table may not exist yet.")
-    print("  Make sure you've run the parse_error_logs notebook in Databricks!")
+        if response.status and response.status.error:
+            print(f"  Details: {response.status.error.message}")
+        print("\n⚠ The error_logs_parsed table may not exist yet.")
+        print("  Make sure you've run the parse_error_logs notebook in Databricks!")
+
+
+if __name__ == "__main__":
+    print("Checking if table exists...\n")
+
+    try:
+        show(execute(sql_check))
+    except Exception as e:
+        print(f"✗ Table check failed: {type(e).__name__}")
+        print(f"  Details: {e}")
+        print("\n⚠ The error_logs_parsed table may not exist yet.")
+        print("  Make sure you've run the parse_error_logs notebook in Databricks!")
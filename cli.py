@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Run one or more Databricks CLI queries over a single warehouse connection.
+
+Usage:
+    python cli.py schema
+    python cli.py table latest5
+    python cli.py all
+"""
+import argparse
+
+import check_schema
+import check_table
+import get_latest_5_logs
+import latest_errors
+from dbx_queries import execute, execute_many
+
+# name -> (sql, renderer, fetch results as Arrow)
+COMMANDS = {
+    "schema": (check_schema.sql_columns, check_schema.show, False),
+    "table": (check_table.sql_check, check_table.show, False),
+    "latest5": (get_latest_5_logs.sql, get_latest_5_logs.show, True),
+    "latest15": (latest_errors.sql, latest_errors.show, True),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query the error_logs_parsed table in Databricks."
+    )
+    parser.add_argument(
+        "commands",
+        nargs="+",
+        choices=[*COMMANDS, "all"],
+        help="Queries to run; several run concurrently on one client",
+    )
+    args = parser.parse_args()
+
+    names = list(COMMANDS) if "all" in args.commands else args.commands
+    queries = [COMMANDS[name] for name in dict.fromkeys(names)]
+
+    try:
+        if len(queries) == 1:
+            sql, _, arrow = queries[0]
+            responses = [execute(sql, arrow)]
+        else:
+            responses = execute_many(
+                [sql for sql, _, _ in queries],
+                arrow=[arrow for _, _, arrow in queries],
+            )
+        for (_, show, _), response in zip(queries, responses):
+            show(response)
+            print()
+    except Exception as e:
+        print(f"✗ Error: {type(e).__name__}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Wait for Databricks SQL statements to finish."""
+from databricks.sdk.service.sql import StatementState
+import time
+
+_IN_PROGRESS = (StatementState.PENDING, StatementState.RUNNING)
+
+
+def poll_until_done(w, response, *, initial=0.025, max_interval=2.0,
+                    total_timeout=300.0):
+    """Poll a statement until it leaves PENDING/RUNNING and return it.
+
+    Submit with a wait_timeout (up to "50s") so that most statements are
+    already finished here. Otherwise the first poll comes after `initial`
+    seconds and the interval grows by 1.5x up to `max_interval`. A
+    statement still running after `total_timeout` seconds is cancelled
+    and TimeoutError is raised.
+    """
+    delay = initial
+    deadline = time.monotonic() + total_timeout
+    while (response.status and
+           response.status.state in _IN_PROGRESS):
+        if time.monotonic() >= deadline:
+            w.statement_execution.cancel_execution(response.statement_id)
+            raise TimeoutError(
+                f"Statement {response.statement_id} still running after "
+                f"{total_timeout:.0f}s"
+            )
+        time.sleep(delay)
+        delay = min(delay * 1.5, max_interval)
+        response = w.statement_execution.get_statement(response.statement_id)
+    return response
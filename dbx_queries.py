@@ -0,0 +1,194 @@
+"""Shared Databricks SQL helpers for the CLI query scripts."""
+from concurrent.futures import ThreadPoolExecutor
+from databricks.sdk import WorkspaceClient
+from databricks.sdk.service.sql import (
+    Disposition,
+    ExecuteStatementRequestOnWaitTimeout,
+    Format,
+)
+from dbx_poll import poll_until_done
+from urllib.request import Request, urlopen
+import os
+
+try:
+    import pyarrow.ipc
+except ImportError:  # Arrow results are optional; fall back to inline JSON
+    pyarrow = None
+
+# One client per process so every query shares the same HTTP session
+w = WorkspaceClient(
+    host=os.getenv('DATABRICKS_HOST'),
+    token=os.getenv('DATABRICKS_TOKEN')
+)
+
+WAREHOUSE_ID = os.getenv('DATABRICKS_WAREHOUSE_ID')
+CATALOG = os.getenv('DATABRICKS_CATALOG', 'dbx_1')
+SCHEMA = os.getenv('DATABRICKS_SCHEMA', 'default')
+# Latest-N queries only look this far back so the planner can prune partitions
+LOOKBACK_DAYS = int(os.getenv('DATABRICKS_LOOKBACK_DAYS', '7'))
+
+
+def _result_options(arrow):
+    """Request Arrow results via external links when pyarrow is available."""
+    if arrow and pyarrow is not None:
+        return {
+            "disposition": Disposition.EXTERNAL_LINKS,
+            "format": Format.ARROW_STREAM,
+        }
+    return {}
+
+
+def submit_async(sql, arrow=False):
+    """Submit a statement without waiting and return its statement ID."""
+    response = w.statement_execution.execute_statement(
+        warehouse_id=WAREHOUSE_ID,
+        statement=sql,
+        catalog=CATALOG,
+        schema=SCHEMA,
+        wait_timeout="0s",
+        on_wait_timeout=ExecuteStatementRequestOnWaitTimeout.CONTINUE,
+        **_result_options(arrow),
+    )
+    return response.statement_id
+
+
+def wait_for(response):
+    """Poll a statement until it leaves PENDING/RUNNING."""
+    return poll_until_done(w, response)
+
+
+def execute(sql, arrow=False):
+    """Execute one statement, letting the server block for up to 50 s.
+
+    With arrow=True the results are fetched as Arrow IPC streams from
+    pre-signed URLs instead of inline JSON; read them with iter_rows().
+    """
+    response = w.statement_execution.execute_statement(
+        warehouse_id=WAREHOUSE_ID,
+        statement=sql,
+        catalog=CATALOG,
+        schema=SCHEMA,
+        wait_timeout="50s",
+        on_wait_timeout=ExecuteStatementRequestOnWaitTimeout.CONTINUE,
+        **_result_options(arrow),
+    )
+    return wait_for(response)
+
+
+def execute_many(sqls, arrow=False):
+    """Submit all statements up front, then poll them concurrently.
+
+    Warehouse queueing and network round-trips overlap, so total wall time
+    tracks the slowest statement rather than the sum of all of them.
+    arrow is either one flag for every statement or a flag per statement.
+    """
+    if isinstance(arrow, bool):
+        arrow = [arrow] * len(sqls)
+    statement_ids = [submit_async(sql, flag) for sql, flag in zip(sqls, arrow)]
+    if not statement_ids:
+        return []
+    with ThreadPoolExecutor(max_workers=len(statement_ids)) as pool:
+        return list(pool.map(
+            lambda sid: wait_for(w.statement_execution.get_statement(sid)),
+            statement_ids,
+        ))
+
+
+def _arrow_rows(link):
+    """Yield rows from the Arrow IPC stream behind one external link."""
+    # Pre-signed links must be fetched without the Databricks auth header,
+    # but some clouds require the extra headers returned with the link
+    request = Request(link.external_link, headers=link.http_headers or {})
+    with urlopen(request) as stream:
+        for batch in pyarrow.ipc.open_stream(stream):
+            yield from zip(*(column.to_pylist() for column in batch.columns))
+
+
+def iter_rows(response):
+    """Yield result rows from either Arrow external links or inline JSON."""
+    result = response.result
+    while result is not None:
+        if result.external_links:
+            for link in result.external_links:
+                yield from _arrow_rows(link)
+            next_index = result.external_links[-1].next_chunk_index
+        else:
+            yield from result.data_array or []
+            next_index = result.next_chunk_index
+        if next_index is None:
+            break
+        result = w.statement_execution.get_statement_result_chunk_n(
+            response.statement_id, next_index
+        )
+
+
+def latest_logs_sql(limit, windowed=True):
+    """SQL for the `limit` most recent logs.
+
+    windowed restricts the scan to the last LOOKBACK_DAYS of event_date
+    partitions; see latest_logs_fallback for tables with nothing that recent.
+    """
+    where = (
+        f"WHERE event_date >= current_date() - INTERVAL {LOOKBACK_DAYS} DAY"
+        if windowed else ""
+    )
+    return f"""
+SELECT timestamp, severity, error_code, file_path, msg
+FROM {CATALOG}.{SCHEMA}.error_logs_parsed
+{where}
+ORDER BY timestamp DESC
+LIMIT {limit}
+"""
+
+
+def latest_logs_fallback(response, limit):
+    """Re-run an empty windowed latest-N query over the whole table.
+
+    Logs ingested once (like the mock data) age out of the lookback window,
+    which would otherwise look like an empty table.
+    """
+    manifest = response.manifest
+    if manifest is None or manifest.total_row_count != 0:
+        return response
+    print(f"No logs in the last {LOOKBACK_DAYS} days "
+          f"(DATABRICKS_LOOKBACK_DAYS); searching all logs...\n")
+    return execute(latest_logs_sql(limit, windowed=False), arrow=True)
+
+
+def format_log_row(i, row):
+    """Format one (timestamp, severity, error_code, file_path, msg) row."""
+    timestamp, severity, error_code, file_path, message = row[:5]
+    return (f"\n#{i}. [{severity}] {error_code} - {timestamp}\n"
+            f"    File: {file_path}\n"
+            f"    Message: {message}")
+
+
+def show_rows(response, title, format_row, width=80):
+    """Print a titled result set and return the number of rows shown.
+
+    Rows are printed as each result chunk arrives, so memory stays constant
+    and the first row appears before later chunks are downloaded.
+    """
+    count = 0
+    for count, row in enumerate(iter_rows(response), 1):
+        if count == 1:
+            print("✓ Query executed successfully!\n")
+            print(title)
+            print("=" * width)
+        print(format_row(count, row))
+
+    if not count:
+        print(f"Query status: {response.status.state if response.status else 'unknown'}")
+        print("No results returned")
+        return 0
+
+    print("\n" + "=" * width)
+    return count
+
+
+def run_query(sql, renderer, arrow=False):
+    """Execute sql and hand the response to renderer, reporting failures."""
+    try:
+        renderer(execute(sql, arrow))
+    except Exception as e:
+        print(f"✗ Error: {type(e).__name__}: {e}")
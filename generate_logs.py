@@ -1,10 +1,8 @@
 import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 
-# Create logs directory
-os.makedirs('mock_logs', exist_ok=True)
-
 # Sample data for realistic log generation
 ERROR_CODES = [
     'CC-1001', 'CC-1002', 'CC-1003', 'CC-1004', 'CC-1005',
@@ -64,45 +62,66 @@ ERROR_MESSAGES = [
     'Corrupted data in storage backend',
 ]
 
+# Header shared by every generated file
+HEADER = (
+    "# Application Error Log\n"
+    f"# Generated: {datetime.now(timezone.utc).isoformat()}Z\n"
+    "# Format: TIMESTAMP\tERROR_CODE\tFILE\tSEVERITY\tMESSAGE\n"
+    + "-" * 120 + "\n"
+)
+
+
+CONFIG_PARAMS = ['db_host', 'api_key', 'timeout', 'max_retries']
+
+# Placeholder filler per template kind; kind 0 is a plain message
+_FORMATTERS = (
+    lambda tmpl, rng: tmpl,
+    lambda tmpl, rng: tmpl.format(key=f'cache_{rng.randint(1000, 9999)}'),
+    lambda tmpl, rng: tmpl.format(filename=rng.choice(FILE_PATHS)),
+    lambda tmpl, rng: tmpl.format(param=rng.choice(CONFIG_PARAMS)),
+    lambda tmpl, rng: tmpl.format(limit=rng.randint(100, 1000)),
+)
+
+
+def _kind(message_template):
+    """Classify a template by the placeholder it contains (0 for none)"""
+    for kind, placeholder in enumerate(
+            ('{key}', '{filename}', '{param}', '{limit}'), 1):
+        if placeholder in message_template:
+            return kind
+    return 0
 
-def generate_timestamp_seconds_back(max_seconds=604800):
-    """Generate a random timestamp within the last max_seconds"""
+
+# Templates paired with their kind, classified once at import
+CLASSIFIED = [(_kind(m), m) for m in ERROR_MESSAGES]
+
+
+def format_message(classified, rng):
+    """Fill in the placeholder of a (kind, template) pair"""
+    kind, message_template = classified
+    return _FORMATTERS[kind](message_template, rng)
+
+
+def generate_log_entries(num_entries, rng, max_seconds=604800):
+    """Generate a batch of log entries, sampling each field in one call"""
     now = datetime.now(timezone.utc)
-    seconds_back = random.randint(0, max_seconds)
-    return now - timedelta(seconds=seconds_back)
-
-
-def generate_log_entry():
-    """Generate a single log entry"""
-    timestamp = generate_timestamp_seconds_back()
-    error_code = random.choice(ERROR_CODES)
-    file_path = random.choice(FILE_PATHS)
-    severity = random.choice(SEVERITIES)
-      
-    # Select and format error message
-    message_template = random.choice(ERROR_MESSAGES)
-    if '{key}' in message_template:
-        cache_key = f'cache_{random.randint(1000, 9999)}'
-        message = message_template.format(key=cache_key)
-    elif '{filename}' in message_template:
-        message = message_template.format(
-            filename=random.choice(FILE_PATHS))
-    elif '{param}' in message_template:
-        params = ['db_host', 'api_key', 'timeout', 'max_retries']
-        message = message_template.format(param=random.choice(params))
-    elif '{limit}' in message_template:
-        message = message_template.format(
-            limit=random.randint(100, 1000))
-    else:
-        message = message_template
-    
-    return {
-        'timestamp': timestamp.isoformat() + 'Z',
-        'error_code': error_code,
-        'file': file_path,
-        'severity': severity,
-        'message': message
-    }
+    seconds_back = rng.choices(range(max_seconds + 1), k=num_entries)
+    error_codes = rng.choices(ERROR_CODES, k=num_entries)
+    file_paths = rng.choices(FILE_PATHS, k=num_entries)
+    severities = rng.choices(SEVERITIES, k=num_entries)
+    templates = rng.choices(CLASSIFIED, k=num_entries)
+
+    return [
+        {
+            'timestamp': (now - timedelta(seconds=secs)).isoformat() + 'Z',
+            'error_code': error_code,
+            'file': file_path,
+            'severity': severity,
+            'message': format_message(template, rng)
+        }
+        for secs, error_code, file_path, severity, template in zip(
+            seconds_back, error_codes, file_paths, severities, templates)
+    ]
 
 
 def format_log_line(log_entry):
@@ -114,36 +133,57 @@ def format_log_line(log_entry):
     )
 
 
-# Generate 200 log files
-num_files = 200
-print(f"Generating {num_files} mock log files...")
+def _write_file(i):
+    """Generate and write mock log file number i (seeded by i)"""
+    rng = random.Random(i)
 
-for i in range(1, num_files + 1):
     # Generate 5-15 log entries per file
-    num_entries = random.randint(5, 15)
+    num_entries = rng.randint(5, 15)
     
     filename = f"mock_logs/app_error_log_{i:03d}.log"
     
-    with open(filename, 'w') as f:
-        # Add a header
-        f.write("# Application Error Log\n")
-        f.write(f"# Generated: {datetime.now(timezone.utc).isoformat()}Z\n")
-        f.write("# Format: TIMESTAMP\tERROR_CODE\tFILE\tSEVERITY\tMESSAGE\n")
-        f.write("-" * 120 + "\n")
-        
-        # Generate log entries
-        for entry_num in range(num_entries):
-            log_entry = generate_log_entry()
-            f.write(format_log_line(log_entry) + "\n")
-    
-    if (i) % 50 == 0:
-        print(f"  Generated {i} files...")
-
-print(f"\n✓ Successfully generated {num_files} mock log files in"
-      f" 'mock_logs' directory")
-print("\nLog file format:")
-print("  - Location: mock_logs/app_error_log_001.log through")
-print("    app_error_log_200.log")
-print("  - Format: TIMESTAMP (UTC) | ERROR_CODE (CC-XXXX) | FILE")
-print("    (path) | SEVERITY (Warning/Error/Event) | MESSAGE")
-print("\nReady for upload to Databricks!")
+    # Build the whole file in memory and write it with a single call
+    body = "".join(
+        format_log_line(log_entry) + "\n"
+        for log_entry in generate_log_entries(num_entries, rng)
+    )
+
+    # Unbuffered fd I/O costs exactly open/write/close per file, skipping the
+    # extra fstat/ioctl/lseek calls the buffered text layer makes on open
+    data = (HEADER + body).encode('utf-8')
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # os.write may write fewer bytes than asked; keep going until done
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def main(num_files=200):
+    """Generate num_files mock log files in parallel"""
+    # Create logs directory
+    os.makedirs('mock_logs', exist_ok=True)
+
+    print(f"Generating {num_files} mock log files...")
+
+    # Files are independent, so spread generation and writes across CPUs
+    with ProcessPoolExecutor() as ex:
+        results = ex.map(_write_file, range(1, num_files + 1), chunksize=8)
+        for i, _ in enumerate(results, 1):
+            if i % 50 == 0:
+                print(f"  Generated {i} files...")
+
+    print(f"\n✓ Successfully generated {num_files} mock log files in"
+          f" 'mock_logs' directory")
+    print("\nLog file format:")
+    print("  - Location: mock_logs/app_error_log_001.log through")
+    print("    app_error_log_200.log")
+    print("  - Format: TIMESTAMP (UTC) | ERROR_CODE (CC-XXXX) | FILE")
+    print("    (path) | SEVERITY (Warning/Error/Event) | MESSAGE")
+    print("\nReady for upload to Databricks!")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,15 +16,39 @@ Databricks configuration can be provided via:
   3. The configure_databricks tool (session-based config)
 """
 
+import asyncio
+import functools
+import hashlib
+import json
+import logging
 import os
 import re
-import sys
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional, Sequence
 
+import anyio
+import httpx
+from cachetools import LRUCache, TTLCache
 from databricks.sdk import WorkspaceClient
+from databricks.sdk.service.sql import (
+    Disposition,
+    ExecuteStatementRequestOnWaitTimeout,
+    Format,
+    StatementParameterListItem,
+    StatementState,
+)
 from mcp.server.fastmcp import FastMCP, Context
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+try:
+    import pyarrow.ipc
+except ImportError:  # Arrow results are optional; fall back to inline JSON
+    pyarrow = None
+
+logger = logging.getLogger("dbx_mcp")
 
 
 # ---------------------------------------------------------------------------
@@ -42,6 +66,8 @@ class DatabricksConfig(BaseModel):
 
 class ErrorLog(BaseModel):
     """A single error log entry."""
+    model_config = ConfigDict(frozen=True)
+
     timestamp: str = Field(description="When the error occurred (UTC)")
     error_code: str = Field(description="Error code (e.g., CC-1001)")
     file_path: str = Field(description="File where error occurred")
@@ -61,6 +87,8 @@ class ErrorSearchResult(BaseModel):
 
 class ErrorFrequency(BaseModel):
     """Error frequency statistics."""
+    model_config = ConfigDict(frozen=True)
+
     error_code: str = Field(description="Error code")
     severity: str = Field(description="Severity level")
     count: int = Field(description="Number of occurrences")
@@ -68,6 +96,8 @@ class ErrorFrequency(BaseModel):
 
 class SeveritySummary(BaseModel):
     """Summary of errors for one severity level."""
+    model_config = ConfigDict(frozen=True)
+
     severity: str = Field(description="Severity level")
     error_count: int = Field(description="Total errors")
     unique_codes: int = Field(description="Distinct error codes")
@@ -81,144 +111,505 @@ _session_configs: dict[str, DatabricksConfig] = {}
 # ---------------------------------------------------------------------------
 # Sanitisation helper
 # ---------------------------------------------------------------------------
-_SAFE_PATTERN = re.compile(r"^[A-Za-z0-9_./ -]+$")
+_SAFE_PATTERN = re.compile(r"[A-Za-z0-9_./ -]+")
 
 
 def _sanitize(value: str) -> str:
-    """Basic SQL injection prevention for string-interpolated values."""
-    cleaned = value.replace("'", "''")
-    if not _SAFE_PATTERN.match(cleaned):
+    """Basic SQL injection prevention for string-interpolated identifiers.
+
+    The whole value must match, so a trailing newline is rejected too.
+    Quotes are not in the allowed set, so no escaping is needed.
+    """
+    if not value:
+        return value
+    if not _SAFE_PATTERN.fullmatch(value):
         raise ValueError(f"Invalid characters in query parameter: {value}")
-    return cleaned
+    return value
 
 
 # ---------------------------------------------------------------------------
 # Config resolution
 # ---------------------------------------------------------------------------
 
+def _session_id(ctx: Context) -> str:
+    """Identify the MCP session a tool call belongs to.
+
+    A Context is created per request, so fall back to the streamable-http
+    session header or the long-lived session object rather than the
+    context itself.
+    """
+    request_context = getattr(ctx, "request_context", None)
+    session_id = getattr(request_context, "session_id", None)
+    if session_id is None:
+        req = getattr(request_context, "request", None)
+        headers = getattr(req, "headers", None) or {}
+        session_id = headers.get("mcp-session-id") or id(
+            getattr(request_context, "session", None) or ctx
+        )
+    return str(session_id)
+
+
+_CONFIG_HEADERS = (
+    "x-databricks-host",
+    "x-databricks-token",
+    "x-databricks-warehouse-id",
+    "x-databricks-catalog",
+    "x-databricks-schema",
+)
+
+# Environment variables never change after startup, so a config built from
+# them and a given set of header values can be reused for later requests
+_resolved_configs: LRUCache = LRUCache(maxsize=256)
+
+
 def _resolve_config(ctx: Optional[Context] = None) -> DatabricksConfig:
     """Resolve Databricks configuration from headers, session, or env vars.
 
-    Priority: HTTP headers > session config > environment variables.
+    Priority: session config > HTTP headers > environment variables.
     """
-    host = os.getenv("DATABRICKS_HOST", "")
-    token = os.getenv("DATABRICKS_TOKEN", "")
-    warehouse_id = os.getenv("DATABRICKS_WAREHOUSE_ID", "")
-    catalog = os.getenv("DATABRICKS_CATALOG", "dbx_1")
-    schema_name = os.getenv("DATABRICKS_SCHEMA", "default")
-
     # Try session config
     if ctx is not None:
-        session_id = getattr(
-            getattr(ctx, "request_context", None), "session_id", None
-        ) or id(ctx)
-        session_cfg = _session_configs.get(str(session_id))
+        session_cfg = _session_configs.get(_session_id(ctx))
         if session_cfg:
             return session_cfg
 
     # Try HTTP headers (available when running streamable-http transport)
+    headers = {}
     if ctx is not None:
         req = getattr(
             getattr(ctx, "request_context", None), "request", None
         )
         if req is not None:
             headers = getattr(req, "headers", {})
-            host = headers.get("x-databricks-host", host)
-            token = headers.get("x-databricks-token", token)
-            warehouse_id = headers.get(
-                "x-databricks-warehouse-id", warehouse_id
-            )
-            catalog = headers.get("x-databricks-catalog", catalog)
-            schema_name = headers.get("x-databricks-schema", schema_name)
 
-    return DatabricksConfig(
-        host=host,
-        token=token,
-        warehouse_id=warehouse_id,
-        catalog=catalog,
-        schema_name=schema_name,
+    key = tuple(headers.get(name) for name in _CONFIG_HEADERS)
+    cfg = _resolved_configs.get(key)
+    if cfg is not None:
+        return cfg
+
+    cfg = DatabricksConfig(
+        host=headers.get(
+            "x-databricks-host", os.getenv("DATABRICKS_HOST", "")
+        ),
+        token=headers.get(
+            "x-databricks-token", os.getenv("DATABRICKS_TOKEN", "")
+        ),
+        warehouse_id=headers.get(
+            "x-databricks-warehouse-id",
+            os.getenv("DATABRICKS_WAREHOUSE_ID", ""),
+        ),
+        catalog=headers.get(
+            "x-databricks-catalog", os.getenv("DATABRICKS_CATALOG", "dbx_1")
+        ),
+        schema_name=headers.get(
+            "x-databricks-schema", os.getenv("DATABRICKS_SCHEMA", "default")
+        ),
     )
+    _resolved_configs[key] = cfg
+    return cfg
 
 
 # ---------------------------------------------------------------------------
 # Query execution
 # ---------------------------------------------------------------------------
 
-def _execute_query(
-    cfg: DatabricksConfig, sql: str
-) -> list[dict]:
-    """Execute a SQL query against a Databricks SQL warehouse."""
+# One WorkspaceClient per (host, token) so tool calls reuse its HTTP pool.
+# Bounded because in HTTP mode every caller (and rotated token) adds one.
+_client_cache: LRUCache = LRUCache(maxsize=256)
+_client_lock = threading.Lock()
+
+
+def _get_client(host: str, token: str) -> WorkspaceClient:
+    """Return a cached WorkspaceClient for the given credentials."""
+    key = (host, token)
+    with _client_lock:
+        client = _client_cache.get(key)
+        if client is None:
+            client = WorkspaceClient(host=host, token=token)
+            _client_cache[key] = client
+        return client
+
+
+_IN_PROGRESS = (StatementState.PENDING, StatementState.RUNNING)
+
+# Errors logged within the last second; a sleeping or broken warehouse makes
+# every tool call fail the same way, so repeats are dropped rather than
+# flooding stderr alongside the stdio protocol stream
+_recent_errors: TTLCache = TTLCache(maxsize=256, ttl=1.0)
+
+
+def _log_query_error(message: str, error: Exception) -> None:
+    """Log a query failure with its traceback, at most once per second."""
+    key = (message, str(error)[:100])
+    if key in _recent_errors:
+        return
+    _recent_errors[key] = True
+    logger.error("%s: %s", message, error, exc_info=error)
+
+
+# Blocking SDK calls run here. The pool size caps how many warehouse
+# requests are in flight at once across all MCP sessions.
+_EXEC_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DBX_MAX_CONCURRENCY", "8")),
+    thread_name_prefix="dbx-sql",
+)
+
+
+async def _in_pool(func, *args, **kwargs):
+    """Run a blocking call on the SDK thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _EXEC_POOL, functools.partial(func, *args, **kwargs)
+    )
+
+
+# Every query selects a fixed column list, so rows are returned as the
+# positional lists the warehouse sent, in select order, with no need to
+# read column names from the result manifest
+_Rows = list[Sequence[Any]]
+
+# Results up to this many rows come back inline as JSON; larger ones are
+# fetched as Arrow from external links when pyarrow is installed, where the
+# extra download round trip is outweighed by the cheaper encoding
+INLINE_ROW_LIMIT = 20
+
+
+def _param_type(value: Any) -> str:
+    """SQL type for a bound Python value."""
+    if isinstance(value, datetime):
+        return "TIMESTAMP"
+    if isinstance(value, int):
+        return "INT"
+    return "STRING"
+
+
+def _bind(params: dict[str, Any]) -> list[StatementParameterListItem]:
+    """Convert named values to statement parameters; None binds NULL."""
+    return [
+        StatementParameterListItem(
+            name=name,
+            value=(
+                None if value is None
+                else value.isoformat() if isinstance(value, datetime)
+                else str(value)
+            ),
+            type=_param_type(value),
+        )
+        for name, value in params.items()
+    ]
+
+
+# Warehouses already asked to start, and the tasks doing so; the task set
+# holds references so pending tasks are not garbage-collected
+_warmed: set[tuple[str, str]] = set()
+_warmup_tasks: set[asyncio.Task] = set()
+
+
+async def _start_warehouse(client: WorkspaceClient, warehouse_id: str) -> None:
+    """Ask a possibly stopped warehouse to start, without waiting for it."""
+    started = time.monotonic()
+    try:
+        await _in_pool(client.warehouses.start, warehouse_id)
+    except Exception as e:
+        logger.warning("Could not start warehouse %s: %s", warehouse_id, e)
+        return
+    logger.info(
+        "Start requested for warehouse %s in %.2fs",
+        warehouse_id,
+        time.monotonic() - started,
+    )
+
+
+def _ensure_warehouse_started(
+    client: WorkspaceClient, cfg: DatabricksConfig
+) -> None:
+    """Wake the warehouse on its first query, overlapping with that query."""
+    key = (cfg.host, cfg.warehouse_id)
+    if key in _warmed:
+        return
+    _warmed.add(key)
+    task = asyncio.create_task(_start_warehouse(client, cfg.warehouse_id))
+    _warmup_tasks.add(task)
+    task.add_done_callback(_warmup_tasks.discard)
+
+
+def _arrow_values(column) -> list:
+    """Convert an Arrow column to the values inline JSON results would hold.
+
+    Timestamps are formatted the way the warehouse writes them inline
+    (millisecond precision, UTC with a Z suffix), so tool output does not
+    change shape when a result is large enough to be fetched as Arrow.
+    """
+    values = column.to_pylist()
+    if not pyarrow.types.is_timestamp(column.type):
+        return values
+    return [
+        None if ts is None else _iso_timestamp(ts) for ts in values
+    ]
+
+
+def _iso_timestamp(ts: datetime) -> str:
+    """Format a timestamp as e.g. 2024-01-31T12:00:00.000Z."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return f"{ts:%Y-%m-%dT%H:%M:%S}.{ts.microsecond // 1000:03d}Z"
+
+
+async def _arrow_rows(client: WorkspaceClient, response) -> list:
+    """Download and decode every Arrow chunk of an EXTERNAL_LINKS result."""
+    rows: list = []
+    result = response.result
+    async with httpx.AsyncClient() as http:
+        while result is not None and result.external_links:
+            for link in result.external_links:
+                # Pre-signed links must be fetched without the Databricks
+                # auth header, but may require the headers sent with them
+                resp = await http.get(
+                    link.external_link, headers=link.http_headers or {}
+                )
+                resp.raise_for_status()
+                # Convert one record batch at a time rather than reading
+                # the whole table first, so the Arrow and Python copies
+                # of the result never coexist in full
+                for batch in pyarrow.ipc.open_stream(resp.content):
+                    rows.extend(zip(*map(_arrow_values, batch.columns)))
+            next_index = result.external_links[-1].next_chunk_index
+            if next_index is None:
+                break
+            result = await _in_pool(
+                client.statement_execution.get_statement_result_chunk_n,
+                response.statement_id,
+                next_index,
+            )
+    return rows
+
+
+async def _run_statement(
+    cfg: DatabricksConfig,
+    sql: str,
+    params: Optional[dict[str, Any]] = None,
+    arrow: bool = False,
+) -> _Rows:
+    """Run one statement and return its rows, raising if it fails.
+
+    With arrow=True (and pyarrow installed) rows are fetched as Arrow IPC
+    from external links instead of inline JSON.
+    """
     if not cfg.host or not cfg.token or not cfg.warehouse_id:
         return []
 
-    try:
-        client = WorkspaceClient(host=cfg.host, token=cfg.token)
-        response = client.statement_execution.execute_statement(
-            warehouse_id=cfg.warehouse_id,
-            statement=sql,
-            catalog=cfg.catalog,
-            schema=cfg.schema_name,
+    result_options = {}
+    if arrow and pyarrow is not None:
+        result_options = {
+            "disposition": Disposition.EXTERNAL_LINKS,
+            "format": Format.ARROW_STREAM,
+        }
+
+    # Building a client can resolve workspace metadata over the network, so
+    # keep it (and the lock it holds) off the event loop
+    client = await _in_pool(_get_client, cfg.host, cfg.token)
+    _ensure_warehouse_started(client, cfg)
+    # The server holds the request open until the statement finishes or
+    # wait_timeout elapses, so short queries need no polling at all
+    response = await _in_pool(
+        client.statement_execution.execute_statement,
+        warehouse_id=cfg.warehouse_id,
+        statement=sql,
+        parameters=_bind(params or {}),
+        catalog=cfg.catalog,
+        schema=cfg.schema_name,
+        wait_timeout="30s",
+        on_wait_timeout=ExecuteStatementRequestOnWaitTimeout.CONTINUE,
+        **result_options,
+    )
+
+    delay = 0.05
+    while (
+        response.status
+        and response.status.state in _IN_PROGRESS
+    ):
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 1.0)
+        response = await _in_pool(
+            client.statement_execution.get_statement,
+            response.statement_id,
         )
 
-        while (
-            response.status
-            and response.status.state in ("RUNNING", "QUEUED")
-        ):
-            time.sleep(0.5)
-            if response.statement_id:
-                response = client.statement_execution.get_statement(
-                    response.statement_id
-                )
+    if response.status and response.status.state != StatementState.SUCCEEDED:
+        error = response.status.error
+        raise RuntimeError(
+            error.message if error and error.message
+            else f"statement {response.status.state}"
+        )
 
-        if not response.result or not response.result.data_array:
-            return []
-        if (
-            not response.manifest
-            or not response.manifest.schema
-            or not response.manifest.schema.columns
-        ):
-            return []
-
-        columns = [
-            col.name for col in response.manifest.schema.columns
-        ]
+    if not response.result:
+        return []
+    if response.result.external_links:
+        return await _arrow_rows(client, response)
+    return response.result.data_array or []
+
+
+# Recent results, so a conversation repeating the same probe within a
+# minute is answered without touching the warehouse
+_result_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+_result_cache_lock = threading.Lock()
+
+
+def _cache_key(
+    cfg: DatabricksConfig, sql: str, params: dict[str, Any]
+) -> tuple:
+    """Key a query result on the statement and the target it ran against.
+
+    The token is part of the key (hashed, never stored) so a caller only
+    sees rows fetched with its own credentials.
+    """
+    h = hashlib.blake2b(sql.encode(), digest_size=16)
+    h.update(repr(sorted(params.items())).encode())
+    digest = h.hexdigest()
+    token = hashlib.blake2b(cfg.token.encode(), digest_size=8).hexdigest()
+    return (
+        digest, token, cfg.host, cfg.warehouse_id, cfg.catalog,
+        cfg.schema_name,
+    )
+
+
+async def _execute_query_async(
+    cfg: DatabricksConfig,
+    sql: str,
+    params: Optional[dict[str, Any]] = None,
+    no_cache: bool = False,
+) -> _Rows:
+    """Execute a SQL query against a Databricks SQL warehouse.
+
+    Blocking SDK calls run on _EXEC_POOL so the event loop stays free to
+    serve other MCP requests while the warehouse works. Pass
+    ``no_cache`` for queries whose result depends on the current time.
+    """
+    params = params or {}
+    key = None if no_cache else _cache_key(cfg, sql, params)
+    if key is not None:
+        with _result_cache_lock:
+            hit = _result_cache.get(key)
+        if hit is not None:
+            return hit
+
+    try:
+        arrow = params.get("limit", 0) > INLINE_ROW_LIMIT
+        rows = await _run_statement(cfg, sql, params, arrow=arrow)
+    except Exception as e:
+        _log_query_error("Query error", e)
+        return []
+
+    if key is not None:
+        with _result_cache_lock:
+            _result_cache[key] = rows
+    return rows
+
+
+# Quoted literals are matched first so markers are only rewritten outside
+# them; `::` casts are excluded by the lookbehind
+_PARAM_MARKER = re.compile(r"'(?:[^'\\]|\\.)*'|(?<![:\w]):([A-Za-z_]\w*)")
+
+
+def _prefix_params(sql: str, params: dict[str, Any], prefix: str) -> str:
+    """Rename the :name markers of params in sql to :{prefix}name."""
+    def rename(m: re.Match) -> str:
+        name = m.group(1)
+        if name is None or name not in params:
+            return m.group(0)
+        return f":{prefix}{name}"
+
+    return _PARAM_MARKER.sub(rename, sql)
+
+
+async def _execute_queries_batch(
+    cfg: DatabricksConfig, queries: list[tuple[str, dict[str, Any]]]
+) -> list[_Rows]:
+    """Execute independent (sql, params) queries as one warehouse statement.
+
+    Each query is tagged with its position and its rows are packed into a
+    JSON column so results of different shapes can share a UNION ALL.
+    Parameter names are prefixed per query so they cannot collide. If the
+    combined statement fails, the queries are run one at a time.
+    """
+    if len(queries) < 2:
         return [
-            dict(zip(columns, row if isinstance(row, list) else list(row)))
-            for row in response.result.data_array
+            await _execute_query_async(cfg, sql, params, no_cache=True)
+            for sql, params in queries
         ]
+
+    parts = []
+    merged: dict[str, Any] = {}
+    for i, (sql, params) in enumerate(queries):
+        prefix = f"q{i}_"
+        sql = _prefix_params(sql, params, prefix)
+        merged.update({prefix + name: v for name, v in params.items()})
+        parts.append(
+            f"SELECT '{i}' AS _tag, "
+            f"to_json(struct(*), map('ignoreNullFields', 'false')) AS _row "
+            f"FROM ({sql}) AS _q"
+        )
+
+    try:
+        rows = await _run_statement(cfg, " UNION ALL ".join(parts), merged)
     except Exception as e:
-        print(f"Query error: {e}", file=sys.stderr)
-        return []
+        _log_query_error("Batch query error, running individually", e)
+        return [
+            await _execute_query_async(cfg, sql, params, no_cache=True)
+            for sql, params in queries
+        ]
+
+    # Packed rows keep their keys in select order
+    results: list[_Rows] = [[] for _ in queries]
+    for tag, packed in rows:
+        results[int(tag)].append(list(json.loads(packed).values()))
+    return results
+
+
+@functools.lru_cache(maxsize=32)
+def _qualified_name(catalog: str, schema_name: str, table: str) -> str:
+    """Validate and join a catalog.schema.table name."""
+    return f"{_sanitize(catalog)}.{_sanitize(schema_name)}.{table}"
 
 
 def _fqn(cfg: DatabricksConfig, table: str) -> str:
-    """Return the fully-qualified table/view name."""
-    return f"{cfg.catalog}.{cfg.schema_name}.{table}"
+    """Return the fully-qualified table/view name.
+
+    Identifiers cannot be bound as parameters, so they are validated here.
+    """
+    return _qualified_name(cfg.catalog, cfg.schema_name, table)
 
 
 # ---------------------------------------------------------------------------
 # MCP Server
 # ---------------------------------------------------------------------------
 
+# Server settings are read from the environment once; they cannot change
+# after the transport has started
+@functools.cache
 def _get_transport() -> str:
     """Get the transport mode from environment."""
     return os.getenv("MCP_TRANSPORT", "stdio")
 
 
+@functools.cache
 def _get_port() -> int:
     """Get the server port from environment."""
     return int(os.getenv("MCP_SERVER_PORT", "8000"))
 
 
+@functools.cache
 def _get_host() -> str:
     """Get the server host from environment."""
     return os.getenv("MCP_SERVER_HOST", "0.0.0.0")
 
 
+# FastMCP configures stderr logging for the whole process at this level
 mcp = FastMCP(
     "databricks-error-logs",
     host=_get_host(),
     port=_get_port(),
+    log_level=os.getenv("MCP_LOG_LEVEL", "INFO").upper(),
 )
 
 TABLE_NAME = "error_logs_parsed"
@@ -254,13 +645,7 @@ async def configure_databricks(
         schema_name=schema_name,
     )
 
-    session_id = str(
-        getattr(
-            getattr(ctx, "request_context", None), "session_id", None
-        )
-        or id(ctx)
-    )
-    _session_configs[session_id] = cfg
+    _session_configs[_session_id(ctx)] = cfg
 
     return (
         f"Databricks configured for session. "
@@ -269,6 +654,254 @@ async def configure_databricks(
     )
 
 
+# Each planner returns the SQL for a tool, its named parameters, and a
+# function that turns the resulting rows into the tool's return value, so
+# the same query can run on its own or as part of batch_search. The SQL
+# text only depends on the table, which lets the warehouse reuse its plan.
+# batch_search reads each query's rows back out of a UNION ALL, which does
+# not promise to keep them in ORDER BY order, so the finish functions
+# re-sort; sorted() is linear on rows that already arrive in order.
+_Plan = tuple[str, dict[str, Any], Callable[[_Rows], Any]]
+
+# Select list shared by the tools that return ErrorLog entries
+_COLS_ERROR_LOG = (
+    "timestamp", "error_code", "file_path", "severity", "message",
+    "source_file",
+)
+_SELECT_ERROR_LOG = ", ".join(_COLS_ERROR_LOG)
+
+# Statement text per tool; only the table name is filled in per call, all
+# filter values are bound as parameters
+_SQL_SEARCH_ERROR_LOGS = (
+    "SELECT " + _SELECT_ERROR_LOG + " FROM {fqn} "
+    "WHERE (:error_code IS NULL OR error_code = :error_code) "
+    "AND (:severity IS NULL OR severity = :severity) "
+    "AND (:file_path IS NULL OR file_path LIKE :file_path) "
+    "AND (:message IS NULL OR message LIKE :message) "
+    "ORDER BY timestamp DESC LIMIT :limit"
+)
+_SQL_ERROR_FREQUENCY = (
+    "SELECT error_code, severity, COUNT(*) as count FROM {fqn} "
+    "WHERE (:severity IS NULL OR severity = :severity) "
+    "GROUP BY error_code, severity "
+    "ORDER BY count DESC LIMIT :limit"
+)
+_SQL_SEVERITY_SUMMARY = (
+    "SELECT severity, COUNT(*) as error_count, "
+    "COUNT(DISTINCT error_code) as unique_codes FROM {fqn} "
+    "GROUP BY severity ORDER BY error_count DESC"
+)
+_SQL_FILE_ERRORS = (
+    "SELECT " + _SELECT_ERROR_LOG + " FROM {fqn} "
+    "WHERE file_path = :file_path "
+    "ORDER BY timestamp DESC LIMIT :limit"
+)
+_SQL_SEARCH_BY_MESSAGE = (
+    "SELECT " + _SELECT_ERROR_LOG + " FROM {fqn} "
+    "WHERE message LIKE :message "
+    "ORDER BY timestamp DESC LIMIT :limit"
+)
+_SQL_SEARCH_BY_TIME_RANGE = (
+    "SELECT " + _SELECT_ERROR_LOG + " FROM {fqn} "
+    "WHERE timestamp >= :low AND timestamp < :high "
+    "AND (:severity IS NULL OR severity = :severity) "
+    "ORDER BY timestamp DESC LIMIT :limit"
+)
+
+
+def _rows_to_error_logs(rows: _Rows) -> list[ErrorLog]:
+    """Build ErrorLog entries from rows selected as _COLS_ERROR_LOG."""
+    # timestamp DESC; NULL timestamps sort last, as in Spark
+    rows = sorted(rows, key=lambda row: row[0] or "", reverse=True)
+    # Rows come straight from the warehouse, so skip model validation
+    return [
+        ErrorLog.model_construct(
+            timestamp=str(ts),
+            error_code=code,
+            file_path=path,
+            severity=sev,
+            message=msg,
+            source_file=src,
+        )
+        for ts, code, path, sev, msg, src in rows
+    ]
+
+
+def _plan_search_error_logs(
+    cfg: DatabricksConfig,
+    error_code: Optional[str] = None,
+    severity: Optional[str] = None,
+    file_path: Optional[str] = None,
+    message_contains: Optional[str] = None,
+    limit: int = 20,
+) -> _Plan:
+    safe_limit = max(1, min(int(limit), 100))
+
+    sql = _SQL_SEARCH_ERROR_LOGS.format(fqn=_fqn(cfg, TABLE_NAME))
+    params = {
+        "error_code": error_code or None,
+        "severity": severity or None,
+        "file_path": f"%{file_path}%" if file_path else None,
+        "message": f"%{message_contains}%" if message_contains else None,
+        "limit": safe_limit,
+    }
+
+    def finish(rows: _Rows) -> ErrorSearchResult:
+        logs = _rows_to_error_logs(rows)
+
+        return ErrorSearchResult(
+            total_found=len(logs),
+            results=logs,
+            query=(
+                f"error_code={error_code}, severity={severity}, "
+                f"file={file_path}, message={message_contains}"
+            ),
+        )
+
+    return sql, params, finish
+
+
+def _plan_get_error_frequency(
+    cfg: DatabricksConfig,
+    severity: Optional[str] = None,
+    limit: int = 10,
+) -> _Plan:
+    safe_limit = max(1, min(int(limit), 100))
+
+    sql = _SQL_ERROR_FREQUENCY.format(fqn=_fqn(cfg, TABLE_NAME))
+    params = {"severity": severity or None, "limit": safe_limit}
+
+    def finish(rows: _Rows) -> list[ErrorFrequency]:
+        rows = sorted(rows, key=lambda row: int(row[2]), reverse=True)
+        return [
+            ErrorFrequency.model_construct(
+                error_code=code, severity=sev, count=int(count)
+            )
+            for code, sev, count in rows
+        ]
+
+    return sql, params, finish
+
+
+def _plan_get_severity_summary(cfg: DatabricksConfig) -> _Plan:
+    sql = _SQL_SEVERITY_SUMMARY.format(fqn=_fqn(cfg, TABLE_NAME))
+    params: dict[str, Any] = {}
+
+    def finish(rows: _Rows) -> list[SeveritySummary]:
+        rows = sorted(rows, key=lambda row: int(row[1]), reverse=True)
+        return [
+            SeveritySummary.model_construct(
+                severity=sev or "Unknown",
+                error_count=int(count),
+                unique_codes=int(codes),
+            )
+            for sev, count, codes in rows
+        ]
+
+    return sql, params, finish
+
+
+def _plan_get_file_errors(
+    cfg: DatabricksConfig,
+    file_path: str,
+    limit: int = 50,
+) -> _Plan:
+    safe_limit = max(1, min(int(limit), 100))
+
+    sql = _SQL_FILE_ERRORS.format(fqn=_fqn(cfg, TABLE_NAME))
+    params = {"file_path": file_path, "limit": safe_limit}
+
+    def finish(rows: _Rows) -> ErrorSearchResult:
+        logs = _rows_to_error_logs(rows)
+
+        return ErrorSearchResult(
+            total_found=len(logs),
+            results=logs,
+            query=f"Errors in file: {file_path}",
+        )
+
+    return sql, params, finish
+
+
+def _plan_search_by_message(
+    cfg: DatabricksConfig,
+    query: str,
+    limit: int = 50,
+) -> _Plan:
+    safe_limit = max(1, min(int(limit), 100))
+
+    sql = _SQL_SEARCH_BY_MESSAGE.format(fqn=_fqn(cfg, TABLE_NAME))
+    params = {"message": f"%{query}%", "limit": safe_limit}
+
+    def finish(rows: _Rows) -> ErrorSearchResult:
+        logs = _rows_to_error_logs(rows)
+
+        return ErrorSearchResult(
+            total_found=len(logs),
+            results=logs,
+            query=f"Message contains: {query}",
+        )
+
+    return sql, params, finish
+
+
+def _plan_search_by_time_range(
+    cfg: DatabricksConfig,
+    hours_ago: int = 24,
+    severity: Optional[str] = None,
+) -> _Plan:
+    safe_hours = max(1, min(int(hours_ago), 8760))
+
+    # Bound the window on both sides so Delta can skip files using the
+    # min/max timestamp stats. The upper bound is rounded up to the next
+    # minute, which keeps the parameters identical for repeated calls and
+    # lets them hit the result caches.
+    now = datetime.now(timezone.utc)
+    high = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    low = high - timedelta(hours=safe_hours)
+
+    sql = _SQL_SEARCH_BY_TIME_RANGE.format(fqn=_fqn(cfg, TABLE_NAME))
+    params = {
+        "low": low,
+        "high": high,
+        "severity": severity or None,
+        "limit": 50,
+    }
+
+    def finish(rows: _Rows) -> ErrorSearchResult:
+        logs = _rows_to_error_logs(rows)
+
+        return ErrorSearchResult(
+            total_found=len(logs),
+            results=logs,
+            query=f"Errors in last {safe_hours} hours (severity={severity})",
+        )
+
+    return sql, params, finish
+
+
+_PLANNERS: dict[str, Callable[..., _Plan]] = {
+    "search_error_logs": _plan_search_error_logs,
+    "get_error_frequency": _plan_get_error_frequency,
+    "get_severity_summary": _plan_get_severity_summary,
+    "get_file_errors": _plan_get_file_errors,
+    "search_by_message": _plan_search_by_message,
+    "search_by_time_range": _plan_search_by_time_range,
+}
+
+MAX_BATCH_ITEMS = 10
+
+
+class BatchSearchItem(BaseModel):
+    """One query in a batch_search request."""
+    kind: str = Field(
+        description="Tool to run, e.g. 'search_error_logs'"
+    )
+    params: dict[str, Any] = Field(
+        default_factory=dict, description="Arguments for that tool"
+    )
+
+
 @mcp.tool()
 async def search_error_logs(
     error_code: Optional[str] = None,
@@ -289,48 +922,10 @@ async def search_error_logs(
         limit: Maximum number of results to return
     """
     cfg = _resolve_config(ctx)
-    where = []
-
-    if error_code:
-        where.append(f"error_code = '{_sanitize(error_code)}'")
-    if severity:
-        where.append(f"severity = '{_sanitize(severity)}'")
-    if file_path:
-        where.append(f"file_path LIKE '%{_sanitize(file_path)}%'")
-    if message_contains:
-        where.append(f"message LIKE '%{_sanitize(message_contains)}%'")
-
-    clause = ("WHERE " + " AND ".join(where)) if where else ""
-    safe_limit = max(1, min(int(limit), 100))
-
-    sql = (
-        f"SELECT timestamp, error_code, file_path, severity, "
-        f"message, source_file "
-        f"FROM {_fqn(cfg, TABLE_NAME)} {clause} "
-        f"ORDER BY timestamp DESC LIMIT {safe_limit}"
-    )
-
-    rows = _execute_query(cfg, sql)
-    logs = [
-        ErrorLog(
-            timestamp=str(r.get("timestamp", "")),
-            error_code=r.get("error_code", ""),
-            file_path=r.get("file_path", ""),
-            severity=r.get("severity", ""),
-            message=r.get("message", ""),
-            source_file=r.get("source_file", ""),
-        )
-        for r in rows
-    ]
-
-    return ErrorSearchResult(
-        total_found=len(logs),
-        results=logs,
-        query=(
-            f"error_code={error_code}, severity={severity}, "
-            f"file={file_path}, message={message_contains}"
-        ),
+    sql, params, finish = _plan_search_error_logs(
+        cfg, error_code, severity, file_path, message_contains, limit
     )
+    return finish(await _execute_query_async(cfg, sql, params))
 
 
 @mcp.tool()
@@ -347,25 +942,8 @@ async def get_error_frequency(
         limit: Maximum number of error codes to return
     """
     cfg = _resolve_config(ctx)
-    where = f"WHERE severity = '{_sanitize(severity)}'" if severity else ""
-    safe_limit = max(1, min(int(limit), 100))
-
-    sql = (
-        f"SELECT error_code, severity, COUNT(*) as count "
-        f"FROM {_fqn(cfg, TABLE_NAME)} {where} "
-        f"GROUP BY error_code, severity "
-        f"ORDER BY count DESC LIMIT {safe_limit}"
-    )
-
-    rows = _execute_query(cfg, sql)
-    return [
-        ErrorFrequency(
-            error_code=r.get("error_code", ""),
-            severity=r.get("severity", ""),
-            count=int(r.get("count", 0)),
-        )
-        for r in rows
-    ]
+    sql, params, finish = _plan_get_error_frequency(cfg, severity, limit)
+    return finish(await _execute_query_async(cfg, sql, params))
 
 
 @mcp.tool()
@@ -376,23 +954,8 @@ async def get_severity_summary(
     Get a summary of errors grouped by severity level.
     """
     cfg = _resolve_config(ctx)
-
-    sql = (
-        f"SELECT severity, COUNT(*) as error_count, "
-        f"COUNT(DISTINCT error_code) as unique_codes "
-        f"FROM {_fqn(cfg, TABLE_NAME)} "
-        f"GROUP BY severity ORDER BY error_count DESC"
-    )
-
-    rows = _execute_query(cfg, sql)
-    return [
-        SeveritySummary(
-            severity=r.get("severity", "Unknown"),
-            error_count=int(r.get("error_count", 0)),
-            unique_codes=int(r.get("unique_codes", 0)),
-        )
-        for r in rows
-    ]
+    sql, params, finish = _plan_get_severity_summary(cfg)
+    return finish(await _execute_query_async(cfg, sql, params))
 
 
 @mcp.tool()
@@ -409,35 +972,8 @@ async def get_file_errors(
         limit: Maximum number of errors to return
     """
     cfg = _resolve_config(ctx)
-    safe_limit = max(1, min(int(limit), 100))
-    safe_path = _sanitize(file_path)
-
-    sql = (
-        f"SELECT timestamp, error_code, file_path, severity, "
-        f"message, source_file "
-        f"FROM {_fqn(cfg, TABLE_NAME)} "
-        f"WHERE file_path = '{safe_path}' "
-        f"ORDER BY timestamp DESC LIMIT {safe_limit}"
-    )
-
-    rows = _execute_query(cfg, sql)
-    logs = [
-        ErrorLog(
-            timestamp=str(r.get("timestamp", "")),
-            error_code=r.get("error_code", ""),
-            file_path=r.get("file_path", ""),
-            severity=r.get("severity", ""),
-            message=r.get("message", ""),
-            source_file=r.get("source_file", ""),
-        )
-        for r in rows
-    ]
-
-    return ErrorSearchResult(
-        total_found=len(logs),
-        results=logs,
-        query=f"Errors in file: {file_path}",
-    )
+    sql, params, finish = _plan_get_file_errors(cfg, file_path, limit)
+    return finish(await _execute_query_async(cfg, sql, params))
 
 
 @mcp.tool()
@@ -454,35 +990,8 @@ async def search_by_message(
         limit: Maximum number of results
     """
     cfg = _resolve_config(ctx)
-    safe_limit = max(1, min(int(limit), 100))
-    safe_query = _sanitize(query)
-
-    sql = (
-        f"SELECT timestamp, error_code, file_path, severity, "
-        f"message, source_file "
-        f"FROM {_fqn(cfg, TABLE_NAME)} "
-        f"WHERE message LIKE '%{safe_query}%' "
-        f"ORDER BY timestamp DESC LIMIT {safe_limit}"
-    )
-
-    rows = _execute_query(cfg, sql)
-    logs = [
-        ErrorLog(
-            timestamp=str(r.get("timestamp", "")),
-            error_code=r.get("error_code", ""),
-            file_path=r.get("file_path", ""),
-            severity=r.get("severity", ""),
-            message=r.get("message", ""),
-            source_file=r.get("source_file", ""),
-        )
-        for r in rows
-    ]
-
-    return ErrorSearchResult(
-        total_found=len(logs),
-        results=logs,
-        query=f"Message contains: {query}",
-    )
+    sql, params, finish = _plan_search_by_message(cfg, query, limit)
+    return finish(await _execute_query_async(cfg, sql, params))
 
 
 @mcp.tool()
@@ -499,45 +1008,84 @@ async def search_by_time_range(
         severity: Optional severity filter ('Warning', 'Error', 'Event')
     """
     cfg = _resolve_config(ctx)
-    safe_hours = max(1, min(int(hours_ago), 8760))
+    sql, params, finish = _plan_search_by_time_range(cfg, hours_ago, severity)
+    return finish(await _execute_query_async(cfg, sql, params))
 
-    sev_clause = ""
-    if severity:
-        sev_clause = f" AND severity = '{_sanitize(severity)}'"
-
-    sql = (
-        f"SELECT timestamp, error_code, file_path, severity, "
-        f"message, source_file "
-        f"FROM {_fqn(cfg, TABLE_NAME)} "
-        f"WHERE timestamp >= current_timestamp() - INTERVAL {safe_hours} HOURS"
-        f"{sev_clause} "
-        f"ORDER BY timestamp DESC LIMIT 50"
-    )
 
-    rows = _execute_query(cfg, sql)
-    logs = [
-        ErrorLog(
-            timestamp=str(r.get("timestamp", "")),
-            error_code=r.get("error_code", ""),
-            file_path=r.get("file_path", ""),
-            severity=r.get("severity", ""),
-            message=r.get("message", ""),
-            source_file=r.get("source_file", ""),
+@mcp.tool()
+async def batch_search(
+    items: list[BatchSearchItem],
+    ctx: Context = None,
+) -> list[ErrorSearchResult | list[ErrorFrequency] | list[SeveritySummary]]:
+    """
+    Run several searches in a single warehouse round trip.
+
+    Each item names one of the search tools and the arguments to pass it,
+    e.g. {"kind": "get_file_errors", "params": {"file_path": "app/main.py"}}.
+    Results are returned in the same order as the items.
+
+    Args:
+        items: Up to 10 {kind, params} queries to run together
+    """
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(
+            f"batch_search accepts at most {MAX_BATCH_ITEMS} items"
         )
-        for r in rows
-    ]
 
-    return ErrorSearchResult(
-        total_found=len(logs),
-        results=logs,
-        query=f"Errors in last {safe_hours} hours (severity={severity})",
+    cfg = _resolve_config(ctx)
+    plans = []
+    for item in items:
+        planner = _PLANNERS.get(item.kind)
+        if planner is None:
+            raise ValueError(
+                f"Unknown kind '{item.kind}'. "
+                f"Expected one of: {', '.join(_PLANNERS)}"
+            )
+        plans.append(planner(cfg, **item.params))
+
+    results = await _execute_queries_batch(
+        cfg, [(sql, params) for sql, params, _ in plans]
     )
+    return [
+        finish(rows) for (_, _, finish), rows in zip(plans, results)
+    ]
 
 
 # ---------------------------------------------------------------------------
 # Entrypoint
 # ---------------------------------------------------------------------------
 
+async def _cache_sweeper() -> None:
+    """Evict expired query results on a timer rather than only on access."""
+    while True:
+        await anyio.sleep(_result_cache.ttl)
+        with _result_cache_lock:
+            _result_cache.expire()
+
+
+async def _warehouse_keepalive(cfg: DatabricksConfig, interval: int) -> None:
+    """Run a trivial query every interval seconds so the warehouse stays up."""
+    while True:
+        await anyio.sleep(interval)
+        await _execute_query_async(cfg, "SELECT 1", no_cache=True)
+
+
+async def _serve_with_background_tasks(serve) -> None:
+    """Run the transport alongside the server's background tasks.
+
+    Keeping the warehouse warm costs compute while the server is idle, so
+    it is off unless DBX_KEEPALIVE_SECONDS is set. It uses the environment
+    configuration.
+    """
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(_cache_sweeper)
+        keepalive = int(os.getenv("DBX_KEEPALIVE_SECONDS", "0"))
+        if keepalive > 0:
+            tg.start_soon(_warehouse_keepalive, _resolve_config(), keepalive)
+        await serve()
+        tg.cancel_scope.cancel()
+
+
 def main():
     """Run the MCP server.
 
@@ -549,7 +1097,6 @@ def main():
 
     if transport == "streamable-http":
         # Add a /health endpoint alongside the MCP app for probes
-        import anyio
         import uvicorn
         from contextlib import asynccontextmanager
         from starlette.applications import Starlette
@@ -575,7 +1122,7 @@ def main():
             lifespan=lifespan,
         )
 
-        async def _serve():
+        async def serve():
             config = uvicorn.Config(
                 app,
                 host=_get_host(),
@@ -584,10 +1131,10 @@ def main():
             )
             server = uvicorn.Server(config)
             await server.serve()
-
-        anyio.run(_serve)
     else:
-        mcp.run(transport="stdio")
+        serve = mcp.run_stdio_async
+
+    anyio.run(_serve_with_background_tasks, serve)
 
 
 if __name__ == "__main__":
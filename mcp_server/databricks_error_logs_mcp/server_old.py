@@ -6,13 +6,39 @@ error logs stored in a Databricks Delta table. It enables developers to
 get error context directly from GitHub Copilot.
 """
 
+import asyncio
+import copy
+import functools
+import hashlib
+import inspect
+import json
 import os
+import sqlite3
+import sys
+import threading
 import time
-from typing import Optional
+from contextlib import closing
+from datetime import timezone
+from typing import Any, Callable, Optional
+import httpx
+from cachetools import TTLCache
 from databricks.sdk import WorkspaceClient
+from databricks.sdk.config import Config
+from databricks.sdk.service.sql import (
+    Disposition,
+    ExecuteStatementRequestOnWaitTimeout,
+    Format,
+    StatementParameterListItem,
+    StatementState,
+)
 from pydantic import BaseModel, Field
 from mcp import FastMCP
 
+try:
+    import pyarrow.ipc
+except ImportError:  # Arrow results are optional; fall back to inline JSON
+    pyarrow = None
+
 # Initialize MCP Server
 mcp = FastMCP(
     "databricks-error-logs",
@@ -23,21 +49,63 @@ mcp = FastMCP(
     }
 )
 
-# Initialize Databricks client
+# Initialize Databricks client. Its keep-alive pool is shared by every
+# tool call; size it so concurrent tools and polls don't open new sockets.
 try:
     w = WorkspaceClient(
-        host=os.getenv("DATABRICKS_HOST"),
-        token=os.getenv("DATABRICKS_TOKEN"),
+        config=Config(
+            host=os.getenv("DATABRICKS_HOST"),
+            token=os.getenv("DATABRICKS_TOKEN"),
+            max_connection_pools=8,
+            max_connections_per_pool=32,
+        )
     )
 except Exception as e:
     w = None
-    print(f"Warning: Could not initialize Databricks client: {e}")
+    print(
+        f"Warning: Could not initialize Databricks client: {e}",
+        file=sys.stderr,
+    )
 
 # Configuration
 CATALOG = os.getenv("DATABRICKS_CATALOG", "dbx_1")
 SCHEMA = os.getenv("DATABRICKS_SCHEMA", "default")
 TABLE_NAME = "error_logs_parsed"
 WAREHOUSE_ID = os.getenv("DATABRICKS_WAREHOUSE_ID")
+# Optional Vector Search index over the error messages (catalog.schema.name)
+# used by search_similar_messages; it must expose the timestamp, error_code,
+# file_path, severity, message and source_file columns
+MESSAGE_INDEX = os.getenv("DATABRICKS_MESSAGE_INDEX")
+
+# Polling: the first poll comes quickly, then the interval grows by 1.5x up
+# to POLL_MAX seconds; statements still running after POLL_TIMEOUT seconds
+# are cancelled
+POLL_INITIAL = float(os.getenv("DBX_POLL_INITIAL", "0.025"))
+POLL_MAX = float(os.getenv("DBX_POLL_MAX", "2.0"))
+POLL_TIMEOUT = 300.0
+_IN_PROGRESS = (StatementState.PENDING, StatementState.RUNNING)
+
+# Successful query results are reused for CACHE_TTL seconds; 0 disables
+CACHE_TTL = int(os.getenv("DBX_MCP_CACHE_TTL", "60"))
+_QUERY_CACHE = TTLCache(maxsize=512, ttl=CACHE_TTL) if CACHE_TTL > 0 else None
+_QUERY_CACHE_LOCK = threading.RLock()
+# Statements currently running, by cache key; identical concurrent calls
+# await the same task instead of each running the statement
+_INFLIGHT: dict[bytes, asyncio.Task] = {}
+
+# The aggregate tools read slowly changing views, so their results are also
+# kept on disk for DISK_CACHE_TTL seconds and survive restarts; 0 disables
+DISK_CACHE_TTL = int(os.getenv("DBX_MCP_DISK_CACHE_TTL", "600"))
+DISK_CACHE_PATH = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "dbx_mcp",
+    "server_old.sqlite3",
+)
+
+# Queries asking for more rows than this are fetched as Arrow from external
+# links when pyarrow is installed; smaller ones stay inline, where the extra
+# download would cost more than the JSON parsing it saves
+INLINE_ROW_LIMIT = 20
 
 
 class ErrorLog(BaseModel):
@@ -85,44 +153,372 @@ class ErrorPattern(BaseModel):
     )
 
 
-def execute_query(sql: str) -> list[dict]:
-    """Execute SQL query against Databricks warehouse"""
+def _parameters(params: dict) -> list[StatementParameterListItem]:
+    """Bind :name markers; ints are sent as INT, everything else as STRING"""
+    return [
+        StatementParameterListItem(
+            name=name,
+            value=str(value),
+            type="INT" if isinstance(value, int) else "STRING",
+        )
+        for name, value in params.items()
+    ]
+
+
+def _format_timestamps(batch, rows: list[dict]) -> None:
+    """Format Arrow timestamps the way inline JSON results carry them
+
+    e.g. 2024-01-31T12:00:00.000Z, so output does not change shape when a
+    result is large enough to be fetched as Arrow.
+    """
+    for field in batch.schema:
+        if not pyarrow.types.is_timestamp(field.type):
+            continue
+        for row in rows:
+            ts = row[field.name]
+            if ts is not None:
+                if ts.tzinfo is not None:
+                    ts = ts.astimezone(timezone.utc)
+                row[field.name] = (
+                    f"{ts:%Y-%m-%dT%H:%M:%S}.{ts.microsecond // 1000:03d}Z"
+                )
+
+
+async def _arrow_rows(response) -> list[dict]:
+    """Download and decode every Arrow chunk of an EXTERNAL_LINKS result"""
+    rows = []
+    result = response.result
+    async with httpx.AsyncClient() as http:
+        while result is not None and result.external_links:
+            for link in result.external_links:
+                # Pre-signed links must be fetched without the Databricks
+                # auth header, but may require the headers sent with them
+                resp = await http.get(
+                    link.external_link, headers=link.http_headers or {}
+                )
+                resp.raise_for_status()
+                # Record batches convert to row dicts column by column in
+                # Arrow's C++ code rather than one zip() per row in Python
+                for batch in pyarrow.ipc.open_stream(resp.content):
+                    batch_rows = batch.to_pylist()
+                    _format_timestamps(batch, batch_rows)
+                    rows.extend(batch_rows)
+            next_index = result.external_links[-1].next_chunk_index
+            if next_index is None:
+                break
+            result = await asyncio.to_thread(
+                w.statement_execution.get_statement_result_chunk_n,
+                response.statement_id,
+                next_index,
+            )
+    return rows
+
+
+async def execute_query(sql: str, params: Optional[dict] = None) -> list[dict]:
+    """Execute SQL query against Databricks warehouse
+
+    User input is passed in params and bound to :name markers in sql, so
+    the statement text stays the same across calls.
+
+    SDK calls run in worker threads so concurrent tool calls are not
+    serialized behind one blocking request.
+
+    Results larger than INLINE_ROW_LIMIT are fetched as Arrow when pyarrow
+    is installed.
+    """
     if not w or not WAREHOUSE_ID:
         return []
+
+    params = params or {}
+    h = hashlib.blake2b(sql.encode(), digest_size=16)
+    h.update(repr(sorted(params.items())).encode())
+    key = h.digest()
+    if _QUERY_CACHE is not None:
+        with _QUERY_CACHE_LOCK:
+            cached = _QUERY_CACHE.get(key)
+        if cached is not None:
+            # Callers get their own copy so they cannot alter the entry
+            return copy.deepcopy(cached)
+
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_run_query(sql, params, key))
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    # Shielded so one caller being cancelled does not fail the others
+    return copy.deepcopy(await asyncio.shield(task))
+
+
+async def poll_until_done(
+    response,
+    *,
+    initial: float = POLL_INITIAL,
+    max_interval: float = POLL_MAX,
+    total_timeout: float = POLL_TIMEOUT,
+):
+    """Poll a statement until it leaves PENDING/RUNNING and return it
+
+    Async counterpart of poll_until_done in the repository's dbx_poll.py,
+    which the CLI scripts use; this package is deployed without it. A
+    statement still running after total_timeout seconds is cancelled and
+    TimeoutError is raised.
+    """
+    delay = initial
+    deadline = time.monotonic() + total_timeout
+    while (response.status and
+           response.status.state in _IN_PROGRESS):
+        if time.monotonic() >= deadline:
+            await asyncio.to_thread(
+                w.statement_execution.cancel_execution,
+                response.statement_id,
+            )
+            raise TimeoutError(
+                f"Statement {response.statement_id} still running after "
+                f"{total_timeout:.0f}s"
+            )
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, max_interval)
+        response = await asyncio.to_thread(
+            w.statement_execution.get_statement,
+            response.statement_id,
+        )
+    return response
+
+
+async def _run_query(sql: str, params: dict, key: bytes) -> list[dict]:
+    """Run one statement to completion and cache its rows under key"""
+    result_options = {}
+    if "limit" in params:
+        # Cap the result on the API side as well, so the response is sized
+        # for the rows the caller asked for
+        result_options["row_limit"] = params["limit"]
+    if pyarrow is not None and params.get("limit", 0) > INLINE_ROW_LIMIT:
+        result_options["disposition"] = Disposition.EXTERNAL_LINKS
+        result_options["format"] = Format.ARROW_STREAM
     
     try:
-        response = w.statement_execution.execute_statement(
+        # The server holds the request open for up to 50 s, the API
+        # maximum, so most queries finish without client-side polling
+        response = await asyncio.to_thread(
+            w.statement_execution.execute_statement,
             warehouse_id=WAREHOUSE_ID,
-            statement=sql
+            statement=sql,
+            parameters=_parameters(params),
+            wait_timeout="50s",
+            on_wait_timeout=ExecuteStatementRequestOnWaitTimeout.CONTINUE,
+            **result_options,
         )
         # Wait for query to complete
-        while (response.status and
-               response.status.state in ("RUNNING", "QUEUED")):
-            time.sleep(0.5)
-            if response.statement_id:
-                response = w.statement_execution.get_statement(
-                    response.statement_id
-                )
+        response = await poll_until_done(response)
         
         # Extract results
-        if (response.result and response.result.data_array and
+        rows = []
+        if response.result and response.result.external_links:
+            rows = await _arrow_rows(response)
+        elif (response.result and response.result.data_array and
                 response.manifest and response.manifest.schema and
                 response.manifest.schema.columns):
             columns = [
                 col.name for col in response.manifest.schema.columns
             ]
-            return [
+            rows = [
                 dict(zip(columns, row))
                 for row in response.result.data_array
             ]
-        return []
+
+        # Only cache answers the warehouse actually produced
+        if (_QUERY_CACHE is not None and response.status and
+                response.status.state == StatementState.SUCCEEDED):
+            with _QUERY_CACHE_LOCK:
+                _QUERY_CACHE[key] = rows
+        return rows
     except Exception as e:
-        print(f"Query error: {e}")
+        print(f"Query error: {e}", file=sys.stderr)
         return []
 
 
+def _disk_cache_db() -> sqlite3.Connection:
+    """Open the on-disk result cache, creating it if needed
+
+    Cached rows are query output, so the directory and file are created
+    readable by the owner only rather than with the default umask.
+    """
+    os.makedirs(os.path.dirname(DISK_CACHE_PATH), mode=0o700, exist_ok=True)
+    os.close(os.open(DISK_CACHE_PATH, os.O_RDWR | os.O_CREAT, 0o600))
+    db = sqlite3.connect(DISK_CACHE_PATH)
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS results "
+        "(key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT NOT NULL)"
+    )
+    return db
+
+
+def _disk_cache_get(key: str) -> Optional[str]:
+    """Return the unexpired JSON stored under key, if any"""
+    try:
+        with closing(_disk_cache_db()) as db:
+            row = db.execute(
+                "SELECT value FROM results WHERE key = ? AND expires > ?",
+                (key, time.time()),
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Disk cache error: {e}", file=sys.stderr)
+        return None
+    return row[0] if row else None
+
+
+def _disk_cache_put(key: str, value: str) -> None:
+    """Store JSON under key for DISK_CACHE_TTL seconds"""
+    now = time.time()
+    try:
+        with closing(_disk_cache_db()) as db, db:
+            db.execute("DELETE FROM results WHERE expires <= ?", (now,))
+            db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                (key, now + DISK_CACHE_TTL, value),
+            )
+    except sqlite3.Error as e:
+        print(f"Disk cache error: {e}", file=sys.stderr)
+
+
+def disk_cached(model: Optional[type[BaseModel]] = None):
+    """Cache a tool's result on disk, keyed by tool name and arguments
+
+    model is the item type of tools that return a list of models; the
+    items are stored as JSON and rebuilt from it. Empty results are not
+    cached, since execute_query also returns [] on failure. The file is
+    shared by every server process of the user, so the key also names the
+    workspace and warehouse queried.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if DISK_CACHE_TTL <= 0:
+                return await fn(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = json.dumps(
+                [
+                    fn.__name__, os.getenv("DATABRICKS_HOST"), WAREHOUSE_ID,
+                    CATALOG, SCHEMA, bound.arguments,
+                ],
+                sort_keys=True,
+            )
+            # sqlite blocks on disk I/O and on other processes' locks
+            cached = await asyncio.to_thread(_disk_cache_get, key)
+            if cached is not None:
+                value = json.loads(cached)
+                if model is not None:
+                    return [model.model_construct(**item) for item in value]
+                return value
+
+            result = await fn(*args, **kwargs)
+            if result:
+                value = (
+                    [item.model_dump() for item in result]
+                    if model is not None else result
+                )
+                await asyncio.to_thread(
+                    _disk_cache_put, key, json.dumps(value, default=str)
+                )
+            return result
+
+        return wrapper
+    return decorator
+
+
+def _rows_to_error_logs(rows: list[dict]) -> list[ErrorLog]:
+    """Build ErrorLog entries from timestamp/code/file/severity/message rows
+
+    Rows come from a typed table, so the models are built without
+    re-validating every field.
+    """
+    construct = ErrorLog.model_construct
+    return [
+        construct(
+            timestamp=str(row.get("timestamp", "")),
+            error_code=row.get("error_code", ""),
+            file_path=row.get("file_path", ""),
+            severity=row.get("severity", ""),
+            message=row.get("message", ""),
+            source_file=row.get("source_file", ""),
+        )
+        for row in rows
+    ]
+
+
+def _array_reader(rows: list[dict], column: str) -> Callable[[Any], list]:
+    """Pick how to read an array column, once for the whole result set
+
+    Arrow results carry each array as a list, while inline JSON results
+    carry it as a JSON-encoded string.
+    """
+    sample = next(
+        (row[column] for row in rows if row.get(column) is not None), None
+    )
+    if isinstance(sample, list):
+        return lambda value: value or []
+    if isinstance(sample, str):
+        return lambda value: json.loads(value) if value else []
+    return lambda value: []
+
+
+def _where_clause(*filters: tuple[bool, str]) -> str:
+    """AND together the predicates whose flag is set"""
+    predicates = [predicate for active, predicate in filters if active]
+    return "WHERE " + " AND ".join(predicates) if predicates else ""
+
+
+# Filter values are bound as parameters, so the statement text depends only
+# on which filters are active; each variant is built once and reused
+
+@functools.lru_cache(maxsize=16)
+def _build_search_sql(
+    has_code: bool, has_severity: bool, has_file: bool, has_message: bool
+) -> str:
+    """SQL for search_error_logs with the given filters active"""
+    where_clause = _where_clause(
+        (has_code, "error_code = :error_code"),
+        (has_severity, "severity = :severity"),
+        (has_file, "file_path LIKE :file_path"),
+        (has_message, "message LIKE :message"),
+    )
+    return f"""
+        SELECT
+            timestamp, error_code, file_path, severity, message, source_file
+        FROM {CATALOG}.{SCHEMA}.{TABLE_NAME}
+        {where_clause}
+        ORDER BY timestamp DESC
+        LIMIT :limit
+    """
+
+
+@functools.lru_cache(maxsize=4)
+def _build_pattern_sql(has_code: bool, has_severity: bool) -> str:
+    """SQL for analyze_error_pattern with the given filters active"""
+    where_clause = _where_clause(
+        (has_code, "error_code = :error_code"),
+        (has_severity, "severity = :severity"),
+    )
+    return f"""
+        SELECT
+            error_code,
+            severity,
+            pattern,
+            pattern_count,
+            example_messages
+        FROM {CATALOG}.{SCHEMA}.error_patterns
+        {where_clause}
+        ORDER BY pattern_count DESC
+        LIMIT 50
+    """
+
+
 @mcp.tool()
-def search_error_logs(
+async def search_error_logs(
     error_code: Optional[str] = None,
     severity: Optional[str] = None,
     file_path: Optional[str] = None,
@@ -142,45 +538,23 @@ def search_error_logs(
     Returns:
         Search results with matching error logs
     """
-    where_clauses = []
-    
+    params = {"limit": int(limit)}
     if error_code:
-        where_clauses.append(f"error_code = '{error_code}'")
+        params["error_code"] = error_code
     if severity:
-        where_clauses.append(f"severity = '{severity}'")
+        params["severity"] = severity
     if file_path:
-        where_clauses.append(f"file_path LIKE '%{file_path}%'")
+        params["file_path"] = f"%{file_path}%"
     if message_contains:
-        where_clauses.append(f"message LIKE '%{message_contains}%'")
+        params["message"] = f"%{message_contains}%"
     
-    where_clause = (
-        "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    sql = _build_search_sql(
+        bool(error_code), bool(severity), bool(file_path),
+        bool(message_contains),
     )
+    results = await execute_query(sql, params)
     
-    sql = f"""
-        SELECT
-            timestamp, error_code, file_path, severity, message,
-            source_file,
-            COUNT(*) OVER (PARTITION BY error_code) as error_frequency
-        FROM {CATALOG}.{SCHEMA}.{TABLE_NAME}
-        {where_clause}
-        ORDER BY timestamp DESC
-        LIMIT {limit}
-    """
-    
-    results = execute_query(sql)
-    
-    error_logs = [
-        ErrorLog(
-            timestamp=str(row.get("timestamp", "")),
-            error_code=row.get("error_code", ""),
-            file_path=row.get("file_path", ""),
-            severity=row.get("severity", ""),
-            message=row.get("message", ""),
-            source_file=row.get("source_file", ""),
-        )
-        for row in results
-    ]
+    error_logs = _rows_to_error_logs(results)
     
     query_desc = (
         f"Errors with code={error_code}, severity={severity}, "
@@ -195,7 +569,8 @@ def search_error_logs(
 
 
 @mcp.tool()
-def get_error_frequency(
+@disk_cached(ErrorFrequency)
+async def get_error_frequency(
     severity: Optional[str] = None,
     limit: int = 20,
 ) -> list[ErrorFrequency]:
@@ -209,7 +584,10 @@ def get_error_frequency(
     Returns:
         List of error codes with frequency information
     """
-    where_clause = f"WHERE severity = '{severity}'" if severity else ""
+    where_clause = "WHERE severity = :severity" if severity else ""
+    params = {"limit": int(limit)}
+    if severity:
+        params["severity"] = severity
     
     sql = f"""
         SELECT
@@ -224,22 +602,19 @@ def get_error_frequency(
         FROM {CATALOG}.{SCHEMA}.error_frequency
         {where_clause}
         ORDER BY occurrence_count DESC
-        LIMIT {limit}
+        LIMIT :limit
     """
     
-    results = execute_query(sql)
+    results = await execute_query(sql, params)
+    read_files = _array_reader(results, "files")
     
     frequencies = [
-        ErrorFrequency(
+        ErrorFrequency.model_construct(
             error_code=row.get("error_code", ""),
             severity=row.get("severity", ""),
             occurrence_count=int(row.get("occurrence_count", 0)),
             affected_files=int(row.get("affected_files", 0)),
-            files=(
-                row.get("files", [])
-                if isinstance(row.get("files"), list)
-                else []
-            ),
+            files=read_files(row.get("files")),
             first_occurrence=str(row.get("first_occurrence", "")),
             last_occurrence=str(row.get("last_occurrence", "")),
         )
@@ -250,7 +625,8 @@ def get_error_frequency(
 
 
 @mcp.tool()
-def analyze_error_pattern(
+@disk_cached(ErrorPattern)
+async def analyze_error_pattern(
     error_code: Optional[str] = None,
     severity: Optional[str] = None,
 ) -> list[ErrorPattern]:
@@ -264,42 +640,23 @@ def analyze_error_pattern(
     Returns:
         Error message patterns with frequency and examples
     """
-    where_clauses = []
+    params = {}
     if error_code:
-        where_clauses.append(f"error_code = '{error_code}'")
+        params["error_code"] = error_code
     if severity:
-        where_clauses.append(f"severity = '{severity}'")
-    
-    where_clause = (
-        "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
-    )
-    
-    sql = f"""
-        SELECT
-            error_code,
-            severity,
-            pattern,
-            pattern_count,
-            example_messages
-        FROM {CATALOG}.{SCHEMA}.error_patterns
-        {where_clause}
-        ORDER BY pattern_count DESC
-        LIMIT 50
-    """
+        params["severity"] = severity
     
-    results = execute_query(sql)
+    sql = _build_pattern_sql(bool(error_code), bool(severity))
+    results = await execute_query(sql, params)
+    read_examples = _array_reader(results, "example_messages")
     
     patterns = [
-        ErrorPattern(
+        ErrorPattern.model_construct(
             error_code=row.get("error_code", ""),
             severity=row.get("severity", ""),
             pattern=row.get("pattern", ""),
             pattern_count=int(row.get("pattern_count", 0)),
-            example_messages=(
-                row.get("example_messages", [])
-                if isinstance(row.get("example_messages"), list)
-                else []
-            ),
+            example_messages=read_examples(row.get("example_messages")),
         )
         for row in results
     ]
@@ -308,7 +665,7 @@ def analyze_error_pattern(
 
 
 @mcp.tool()
-def get_file_errors(
+async def get_file_errors(
     file_path: str,
     limit: int = 50,
 ) -> ErrorSearchResult:
@@ -326,24 +683,16 @@ def get_file_errors(
         SELECT
             timestamp, error_code, file_path, severity, message, source_file
         FROM {CATALOG}.{SCHEMA}.{TABLE_NAME}
-        WHERE file_path = '{file_path}'
+        WHERE file_path = :file_path
         ORDER BY timestamp DESC
-        LIMIT {limit}
+        LIMIT :limit
     """
     
-    results = execute_query(sql)
+    results = await execute_query(
+        sql, {"file_path": file_path, "limit": int(limit)}
+    )
     
-    error_logs = [
-        ErrorLog(
-            timestamp=str(row.get("timestamp", "")),
-            error_code=row.get("error_code", ""),
-            file_path=row.get("file_path", ""),
-            severity=row.get("severity", ""),
-            message=row.get("message", ""),
-            source_file=row.get("source_file", ""),
-        )
-        for row in results
-    ]
+    error_logs = _rows_to_error_logs(results)
     
     return ErrorSearchResult(
         total_found=len(results),
@@ -353,7 +702,7 @@ def get_file_errors(
 
 
 @mcp.tool()
-def search_by_message(
+async def search_by_message(
     query: str,
     limit: int = 50,
 ) -> ErrorSearchResult:
@@ -372,24 +721,16 @@ def search_by_message(
         SELECT
             timestamp, error_code, file_path, severity, message, source_file
         FROM {CATALOG}.{SCHEMA}.{TABLE_NAME}
-        WHERE message LIKE '%{query}%'
+        WHERE message LIKE :query
         ORDER BY timestamp DESC
-        LIMIT {limit}
+        LIMIT :limit
     """
     
-    results = execute_query(sql)
+    results = await execute_query(
+        sql, {"query": f"%{query}%", "limit": int(limit)}
+    )
     
-    error_logs = [
-        ErrorLog(
-            timestamp=str(row.get("timestamp", "")),
-            error_code=row.get("error_code", ""),
-            file_path=row.get("file_path", ""),
-            severity=row.get("severity", ""),
-            message=row.get("message", ""),
-            source_file=row.get("source_file", ""),
-        )
-        for row in results
-    ]
+    error_logs = _rows_to_error_logs(results)
     
     return ErrorSearchResult(
         total_found=len(results),
@@ -399,7 +740,53 @@ def search_by_message(
 
 
 @mcp.tool()
-def get_severity_summary() -> dict:
+async def search_similar_messages(
+    query: str,
+    limit: int = 20,
+) -> ErrorSearchResult:
+    """
+    Semantic search for errors whose messages are similar to the query.
+    
+    Unlike search_by_message, results need not contain the query text;
+    they are the closest matches, most similar first. Requires a Vector
+    Search index (DATABRICKS_MESSAGE_INDEX); without one this falls back
+    to search_by_message.
+    
+    Args:
+        query: Description of the error to look for
+               (e.g., 'database connection dropped')
+        limit: Number of similar errors to return
+    
+    Returns:
+        Most similar error logs
+    """
+    if not MESSAGE_INDEX:
+        return await search_by_message(query, limit)
+    
+    sql = f"""
+        SELECT
+            timestamp, error_code, file_path, severity, message, source_file
+        FROM vector_search(
+            index => '{MESSAGE_INDEX}',
+            query_text => :query,
+            num_results => :limit
+        )
+    """
+    
+    results = await execute_query(
+        sql, {"query": query, "limit": int(limit)}
+    )
+    
+    return ErrorSearchResult(
+        total_found=len(results),
+        results=_rows_to_error_logs(results),
+        query=f"Messages similar to: {query}"
+    )
+
+
+@mcp.tool()
+@disk_cached()
+async def get_severity_summary() -> dict:
     """
     Get a summary of errors by severity level.
     
@@ -418,23 +805,77 @@ def get_severity_summary() -> dict:
         ORDER BY error_count DESC
     """
     
-    results = execute_query(sql)
+    results = await execute_query(sql)
     
+    # Columns arrive in SELECT order, so unpack them instead of looking
+    # each one up by name
     summary = {
-        row.get("severity", "Unknown"): {
-            "error_count": int(row.get("error_count", 0)),
-            "unique_codes": int(row.get("unique_codes", 0)),
-            "earliest": str(row.get("earliest", "")),
-            "latest": str(row.get("latest", "")),
+        severity: {
+            "error_count": int(error_count),
+            "unique_codes": int(unique_codes),
+            "earliest": str(earliest),
+            "latest": str(latest),
         }
-        for row in results
+        for severity, error_count, unique_codes, earliest, latest
+        in map(dict.values, results)
     }
     
     return summary
 
 
+@mcp.tool()
+async def overview(
+    severity: Optional[str] = None,
+    limit: int = 20,
+) -> dict:
+    """
+    Get a dashboard view of the error logs in one call.
+    
+    Prefer this over calling get_severity_summary, get_error_frequency and
+    analyze_error_pattern separately; their queries run concurrently.
+    
+    Args:
+        severity: Filter frequencies and patterns by severity level
+        limit: Maximum number of error codes to return
+    
+    Returns:
+        Severity summary, most frequent errors and top message patterns
+    """
+    summary, frequencies, patterns = await asyncio.gather(
+        get_severity_summary(),
+        get_error_frequency(severity=severity, limit=limit),
+        analyze_error_pattern(severity=severity),
+    )
+    
+    return {
+        "severity_summary": summary,
+        "top_errors": frequencies,
+        "patterns": patterns,
+    }
+
+
+def warm_up():
+    """Open the HTTP connection and wake the warehouse before first use.
+
+    The SELECT 1 is submitted without waiting for it, so the TLS handshake
+    and any warehouse start happen while the client is still connecting.
+    """
+    if not w or not WAREHOUSE_ID:
+        return
+    try:
+        w.config.authenticate()
+        w.statement_execution.execute_statement(
+            warehouse_id=WAREHOUSE_ID,
+            statement="SELECT 1",
+            wait_timeout="0s",
+        )
+    except Exception as e:
+        print(f"Warm-up failed: {e}", file=sys.stderr)
+
+
 def main():
     """Entry point for the MCP server."""
+    threading.Thread(target=warm_up, daemon=True).start()
     mcp.run(transport="stdio")
 
 
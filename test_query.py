@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 from databricks.sdk import WorkspaceClient
+from databricks.sdk.service.sql import ExecuteStatementRequestOnWaitTimeout
+from dbx_poll import poll_until_done
 import os
-import time
 
 w = WorkspaceClient(
     host=os.getenv('DATABRICKS_HOST'),
@@ -27,21 +28,13 @@ try:
         warehouse_id=WAREHOUSE_ID,
         statement=sql,
         catalog=CATALOG,
-        schema=SCHEMA
+        schema=SCHEMA,
+        wait_timeout="50s",
+        on_wait_timeout=ExecuteStatementRequestOnWaitTimeout.CONTINUE,
     )
     
     # Wait for query to complete
-    max_wait = 30
-    waited = 0
-    while (response.status and
-           response.status.state in ("RUNNING", "QUEUED") and
-           waited < max_wait):
-        time.sleep(0.5)
-        waited += 0.5
-        if response.statement_id:
-            response = w.statement_execution.get_statement(
-                response.statement_id
-            )
+    response = poll_until_done(w, response)
     
     # Get results
     if response.result and response.result.data_array: